@@ -1,34 +1,70 @@
-from typing import Tuple, Optional
 import sys
 import os
 import time
+import numpy as np
 from ortools.sat.python import cp_model
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 utils_path = '../../'
 base_dir = os.path.dirname(__file__)
 sys.path.append(os.path.abspath(os.path.join(base_dir, utils_path)))
 
 from utils.graph import ColorGraph
+from utils.csr import graph_csr, compute_degrees, warm_up
 from helpers.solutions_stats import SolutionStats
+from helpers.greedy_bounds import greedy_dsatur, greedy_clique_lower_bound, greedy_clique_cover
 from helpers.solution_visualisation import visualize_resolution_time, visualize_solvability
 from helpers.solution_save import save_results_to_file
 
 TIMEOUT_SECONDS = 600
-MAX_WORKERS = 8  
+SOLVER_WORKERS = 2  # threads CP-SAT par résolution
+MAX_WORKERS = max(1, (os.cpu_count() or 1) // SOLVER_WORKERS)  # résolutions en parallèle
+
+class StopAtLowerBound(cp_model.CpSolverSolutionCallback):
+    """
+    Arrête la recherche dès qu'une solution atteint la borne inférieure connue
+    de la couleur maximale : elle est alors optimale.
+    """
+
+    def __init__(self, lower_bound):
+        super().__init__()
+        self.lower_bound = lower_bound
+
+    def on_solution_callback(self):
+        if self.ObjectiveValue() <= self.lower_bound:
+            self.StopSearch()
+
+# Solveur CP-SAT partagé par toutes les instances d'un même processus : il ne porte que les
+# paramètres de résolution, seul le modèle est recréé pour chaque graphe
+_SOLVER = cp_model.CpSolver()
 
 class GraphColoringSolver:
     """
     Classe pour résoudre le problème de coloration de graphe avec OR-Tools.
     """
 
+    __slots__ = (
+        'graph', 'model', 'solver', 'colors', 'max_color', 'lower_bound',
+        '_g', '_nodes', '_num_nodes', '_node_to_idx', '_edges', '_num_edges', 'indptr', 'indices'
+    )
+
     def __init__(self, graph):
         self.graph = graph
         self.model = cp_model.CpModel()
-        self.solver = cp_model.CpSolver()
-        self.colors = {}
+        self.solver = _SOLVER
+        self.colors = []
         self.max_color = None
+        self.lower_bound = 0
+        # Adjacence du graphe lue une seule fois, réutilisée par toutes les méthodes
+        self._g = graph.getGraph()
+        self._nodes = tuple(self._g.keys())
+        self._num_nodes = len(self._g)
+        # Indice dense 0..n-1 de chaque nœud (position dans self._nodes et dans self.colors)
+        self._node_to_idx = {node: i for i, node in enumerate(self._nodes)}
+        self._edges = [(u, v) for u, nbrs in self._g.items() for v in nbrs if u < v]
+        self._num_edges = len(self._edges)
+        # Représentation CSR du graphe (celle de ColorGraph), le nœud v étant à l'indice v - 1
+        self.indptr, self.indices = graph_csr(graph)
         self.setup_solver()
 
     def setup_solver(self):
@@ -40,30 +76,64 @@ class GraphColoringSolver:
         """
         self.solver.parameters.max_time_in_seconds = TIMEOUT_SECONDS
         self.solver.parameters.log_search_progress = False
-        self.solver.parameters.num_search_workers = MAX_WORKERS
+        self.solver.parameters.num_search_workers = SOLVER_WORKERS
 
-    def create_variables(self):
+    def create_variables(self, hints=True):
         """
         Crée les variables de décision :
-        - Une variable par nœud représentant sa couleur (0 à n-1).
-        - Une variable globale pour représenter la couleur maximale utilisée.
+        - Une variable par nœud représentant sa couleur (0 à K-1, K borne supérieure obtenue par DSATUR).
+        - Une variable globale pour représenter la couleur maximale utilisée (L-1 à K-1, L taille d'une clique).
+        - La coloration DSATUR est fournie comme indication (hint) au solveur si `hints` est vrai.
         """
-        g = self.graph.getGraph()
-        num_nodes = len(g)
-        self.colors = {node: self.model.NewIntVar(0, num_nodes - 1, f'color_{node}') for node in g}
-        self.max_color = self.model.NewIntVar(0, num_nodes - 1, 'max_color')
+        K, greedy_coloring = greedy_dsatur(self._g)
+        L = greedy_clique_lower_bound(self._g)
+        self.colors = [self.model.NewIntVar(0, K - 1, f'color_{node}') for node in self._nodes]
+        self.lower_bound = max(L, 1) - 1
+        self.max_color = self.model.NewIntVar(self.lower_bound, K - 1, 'max_color')
+
+        # La coloration gloutonne sert de point de départ à la recherche
+        if hints:
+            for i, node in enumerate(self._nodes):
+                self.model.AddHint(self.colors[i], greedy_coloring[node])
+            self.model.AddHint(self.max_color, K - 1)
 
     def add_constraints(self):
         """
         Ajoute les contraintes au modèle :
         - Les couleurs des nœuds connectés doivent être différentes.
+          Les arêtes sont couvertes par des cliques (une contrainte AllDifferent par clique),
+          les arêtes restantes donnant chacune une contrainte de différence.
         - Chaque nœud doit avoir une couleur inférieure ou égale à la couleur maximale.
+        - Brisure de symétrie sur le nœud de plus haut degré et son voisin de plus haut degré.
         """
-        g = self.graph.getGraph()
-        for node in g:
-            for child in g[node]:
-                self.model.Add(self.colors[node] != self.colors[child])
-            self.model.Add(self.colors[node] <= self.max_color)
+        idx = self._node_to_idx
+        cliques, edges = greedy_clique_cover(self._g)
+        for clique in cliques:
+            self.model.AddAllDifferent([self.colors[idx[node]] for node in clique])
+        for u, v in edges:
+            self.model.Add(self.colors[idx[u]] != self.colors[idx[v]])
+
+        for color in self.colors:
+            self.model.Add(color <= self.max_color)
+
+        # Brise la symétrie des couleurs : le nœud de plus haut degré prend la couleur 0
+        # et son voisin de plus haut degré l'une des deux premières couleurs
+        degrees = compute_degrees(self.indptr)
+        h = int(np.argmax(degrees))
+        self.model.Add(self.colors[h] == 0)
+        neighbors = self.indices[self.indptr[h]:self.indptr[h + 1]]
+        if neighbors.size > 0:
+            h2 = int(neighbors[np.argmax(degrees[neighbors])])
+            self.model.Add(self.colors[h2] <= 1)
+
+    def build_model(self, hints=True):
+        """
+        Construit un nouveau modèle : variables, contraintes et objectif (minimiser la couleur maximale).
+        """
+        self.model = cp_model.CpModel()
+        self.create_variables(hints)
+        self.add_constraints()
+        self.model.Minimize(self.max_color)
 
     def solve(self):
         """
@@ -73,7 +143,7 @@ class GraphColoringSolver:
         - Retourne les statistiques sur la solution.
         """
         # Vérifie si le graphe est vide
-        if not self.graph.getGraph():
+        if not self._g:
             return SolutionStats(
                 status=cp_model.INFEASIBLE,
                 coloring={},
@@ -84,21 +154,26 @@ class GraphColoringSolver:
                 solved=False
             )
 
-        self.create_variables()
-        self.add_constraints()
-        self.model.Minimize(self.max_color)
+        self.build_model()
 
         start_time = time.time()
-        status = self.solver.Solve(self.model)
+        try:
+            status = self.solver.Solve(self.model, StopAtLowerBound(self.lower_bound))
+        except IndexError:
+            # Sur certaines instances (david), CP-SAT échoue (absl::btree_map::at) lorsque
+            # l'indication DSATUR est combinée aux cliques et aux couleurs fixées :
+            # le modèle est reconstruit sans indication
+            self.build_model(hints=False)
+            status = self.solver.Solve(self.model, StopAtLowerBound(self.lower_bound))
         duration = time.time() - start_time
 
-        num_nodes = len(self.graph.getGraph())
-        num_edges = sum(len(neighbors) for neighbors in self.graph.getGraph().values()) // 2
+        num_nodes = self._num_nodes
+        num_edges = self._num_edges
         max_edges = (num_nodes * (num_nodes - 1)) // 2
         edge_density = num_edges / max_edges if max_edges > 0 else 0
 
         solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and (duration <= TIMEOUT_SECONDS)
-        coloring = {node: self.solver.Value(self.colors[node]) for node in self.colors} if (status in (cp_model.OPTIMAL, cp_model.FEASIBLE)) else None
+        coloring = {node: self.solver.Value(self.colors[i]) for node, i in self._node_to_idx.items()} if (status in (cp_model.OPTIMAL, cp_model.FEASIBLE)) else None
         num_colors = self.solver.Value(self.max_color) + 1 if (status in (cp_model.OPTIMAL, cp_model.FEASIBLE)) else None
 
         return SolutionStats(
@@ -134,36 +209,49 @@ def process_graph(graph):
             print(f"Colors used: {stats.num_colors}")
         print(f"Time: {stats.duration:.2f}s")
         
-        edges = list(graph.getGraph().items())
-        edges = [(node, child) for node, children in edges for child in children]
+        # Arêtes (u, v) avec u < v, construites à partir de la représentation CSR
+        node_ids, indptr, indices = graph.to_csr()
+        edges_arr = np.column_stack([np.repeat(node_ids, np.diff(indptr)), indices])
+        edges = edges_arr[edges_arr[:, 0] < edges_arr[:, 1]].tolist()
         save_results_to_file("results", graph.name, stats, edges, status_name)
 
     return stats
 
+def process_graph_by_name(name):
+    """
+    Charge le graphe `name` dans le processus de travail, puis le traite.
+    """
+    return process_graph(ColorGraph.load(name))
+
 def main():
     """
     Fonction principale :
-    - Charge tous les graphes disponibles.
+    - Liste tous les graphes disponibles, chargés à la demande.
     - Résout chaque graphe en parallèle.
     - Affiche un résumé des performances.
     """
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()]
-    graphs = sorted(list_g, key=lambda x: x.countNode())
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
+    # Noyaux Numba compilés une seule fois, avant la création des processus de travail
+    warm_up()
     
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_graph, graph): i for i, graph in enumerate(graphs)
-        }
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_name = {executor.submit(process_graph_by_name, name): name for name in names}
         
-        for future in futures:
-            stats = future.result()
+        for future in as_completed(future_to_name):
+            # L'échec d'un graphe n'interrompt pas le traitement des autres
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"\nUnexpected error for {future_to_name[future]}: {str(e)}")
+                continue
             if stats:
                 results.append(stats)
 
     if results:
         print("\nSummary:")
-        print(f"Total graphs: {len(list_g)}")
+        print(f"Total graphs: {len(names)}")
         print(f"Solved: {sum(1 for r in results if r.solved)}")
         avg_time = sum(r.duration for r in results) / len(results)
         print(f"Average time: {avg_time:.2f}s")
@@ -1,16 +1,17 @@
 import sys
 import os
 import time
-import matplotlib.pyplot as plt
-import networkx as nx
 from ortools.sat.python import cp_model
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.graph import ColorGraph
+from utils.csr import graph_csr, edge_list, warm_up
+from helpers.greedy_bounds import greedy_dsatur
 
 TIMEOUT_SECONDS = 60
-MAX_WORKERS = 8
+SOLVER_WORKERS = 2  # threads CP-SAT par résolution
+MAX_WORKERS = max(1, (os.cpu_count() or 1) // SOLVER_WORKERS)  # résolutions en parallèle
 
 def solve(graph):
     """
@@ -20,33 +21,64 @@ def solve(graph):
     - Minimise le nombre de couleurs utilisées.
     """
     model = cp_model.CpModel()
+    g = graph.getGraph()
     num_nodes = graph.countNode()
     
+    # Borne supérieure K du nombre chromatique obtenue par un DSATUR glouton :
+    # seules les couleurs 0..K-1 sont modélisées
+    K, _ = greedy_dsatur(g)
+    
     # Création des variables de décision
     # X[(i, c)] indique si le nœud i utilise la couleur c
     X = {}
     for i in range(num_nodes):
-        for c in range(num_nodes):
+        for c in range(K):
             X[(i, c)] = model.NewBoolVar(f'X_{i}_{c}')
     
     # used[c] indique si la couleur c est utilisée
-    used = [model.NewBoolVar(f'used_{c}') for c in range(num_nodes)]
+    used = [model.NewBoolVar(f'used_{c}') for c in range(K)]
     
     # Contrainte : Chaque nœud doit utiliser exactement une couleur
     for i in range(num_nodes):
-        model.Add(sum(X[(i, c)] for c in range(num_nodes)) == 1)
+        model.AddExactlyOne(X[(i, c)] for c in range(K))
     
     # Contrainte : Deux nœuds adjacents ne peuvent pas avoir la même couleur
-    for i in range(1, num_nodes + 1):
-        for j in graph.childNode(i):
-            if i < j:  # Évite les doublons en traitant chaque arête une seule fois
-                for c in range(num_nodes):
-                    model.Add(X[(i-1, c)] + X[(j-1, c)] <= 1)
-    
-    # Contrainte : Si un nœud utilise une couleur, cette couleur est marquée comme utilisée
-    for i in range(num_nodes):
-        for c in range(num_nodes):
-            model.AddImplication(X[(i, c)], used[c])
+    # (edge_list ne renvoie chaque arête qu'une seule fois, avec des indices 0 à n-1)
+    indptr, indices = graph_csr(graph)
+    for i, j in edge_list(indptr, indices).tolist():
+        for c in range(K):
+            model.AddBoolOr([X[(i, c)].Not(), X[(j, c)].Not()])
+    
+    # Contrainte : une couleur est utilisée si et seulement si au moins un nœud la porte
+    for c in range(K):
+        model.AddMaxEquality(used[c], [X[(i, c)] for i in range(num_nodes)])
+    
+    # Brisure de symétrie : les couleurs sont utilisées dans l'ordre des indices
+    for c in range(K - 1):
+        model.Add(used[c] >= used[c + 1])
+    
+    # Brisure de symétrie : le nœud de plus haut degré prend la couleur 0
+    # et son voisin de plus haut degré l'une des deux premières couleurs
+    fixed = set()
+    if g:
+        h = max(g, key=lambda node: len(g[node]))
+        model.Add(X[(h - 1, 0)] == 1)
+        fixed.add(h)
+        if g[h]:
+            h2 = max(g[h], key=lambda node: len(g[node]))
+            for c in range(2, K):
+                model.Add(X[(h2 - 1, c)] == 0)
+            fixed.add(h2)
+    
+    # Brisure de symétrie : deux nœuds non adjacents ayant exactement le même voisinage
+    # sont interchangeables, leurs couleurs sont donc ordonnées (hors nœuds déjà fixés)
+    twins = {}
+    for node in g:
+        if node not in fixed:
+            twins.setdefault(frozenset(g[node]), []).append(node)
+    for group in twins.values():
+        for u, v in zip(group, group[1:]):
+            model.Add(sum(c * X[(u - 1, c)] for c in range(K)) <= sum(c * X[(v - 1, c)] for c in range(K)))
     
     # Objectif : Minimiser le nombre total de couleurs utilisées
     model.Minimize(sum(used))
@@ -54,14 +86,15 @@ def solve(graph):
     # Configuration et résolution du modèle
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = TIMEOUT_SECONDS
+    solver.parameters.num_search_workers = SOLVER_WORKERS
     st = time.time()
     status = solver.Solve(model)
     duration = time.time() - st
     
     # Si une solution est trouvée, on récupère les résultats
     if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-        coloring = {i + 1: c for i in range(num_nodes) for c in range(num_nodes) if solver.Value(X[(i, c)])}
-        num_colors_used = sum(solver.Value(used[c]) for c in range(num_nodes))
+        coloring = {i + 1: c for i in range(num_nodes) for c in range(K) if solver.Value(X[(i, c)])}
+        num_colors_used = sum(solver.Value(used[c]) for c in range(K))
         return status, coloring, num_colors_used, duration
     else:
         return status, None, None, duration
@@ -102,21 +135,34 @@ def process_graph(graph):
     
     return (num_nodes, edge_density, duration, solved)
 
+def process_graph_by_name(name):
+    """
+    Charge le graphe `name` dans le processus de travail, puis le traite.
+    """
+    return process_graph(ColorGraph.load(name))
+
 def main():
     """
     Fonction principale :
-    - Charge tous les graphes à résoudre.
+    - Liste les graphes à résoudre, chargés à la demande.
     - Traite chaque graphe en parallèle.
     - Affiche un résumé global des performances.
     """
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()]
-    list_g = sorted(list_g, key=lambda x: x.countNode())
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
+    # Noyaux Numba compilés une seule fois, avant la création des processus de travail
+    warm_up()
     
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_graph, graph): i for i, graph in enumerate(list_g)}
-        for future in futures:
-            stats = future.result()
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_name = {executor.submit(process_graph_by_name, name): name for name in names}
+        for future in as_completed(future_to_name):
+            # L'échec d'un graphe n'interrompt pas le traitement des autres
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"\nUnexpected error for {future_to_name[future]}: {str(e)}")
+                continue
             if stats:
                 results.append(stats)
     
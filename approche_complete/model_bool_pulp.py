@@ -1,24 +1,51 @@
 import sys
 import os
 import time
-import threading
-from pulp import LpProblem, LpVariable, lpSum, LpMinimize, LpBinary, LpStatus
+from functools import lru_cache
+from pulp import LpProblem, LpVariable, lpSum, LpMinimize, LpBinary, LpStatus, LpSolutionOptimal
 from pulp import PULP_CBC_CMD
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from pulp import HiGHS
+except ImportError:
+    HiGHS = None
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.graph import ColorGraph
+from helpers.greedy_bounds import greedy_dsatur
 
 TIMEOUT_SECONDS = 60
-MAX_WORKERS = 8
+SOLVER_WORKERS = 2  # threads du solveur MIP par résolution
+MAX_WORKERS = max(1, (os.cpu_count() or 1) // SOLVER_WORKERS)  # résolutions en parallèle
+
+@lru_cache(maxsize=None)
+def mip_solver(timeout):
+    """
+    Solveur MIP de PuLP, créé une seule fois par processus et par limite de temps
+    puis réutilisé pour tous les graphes.
+    HiGHS (paquet optionnel highspy) est utilisé s'il est installé : il résout le modèle dans
+    le processus, sans écrire de fichier LP ni lancer de sous-processus. À défaut, CBC est
+    lancé en sous-processus.
+    """
+    if HiGHS is not None:
+        solver = HiGHS(msg=False, timeLimit=timeout, threads=SOLVER_WORKERS)
+        if solver.available():
+            return solver
+    return PULP_CBC_CMD(msg=False, timeLimit=timeout, threads=SOLVER_WORKERS)
 
 def solve_with_timeout(graph, timeout):
     """
-    Fonction qui résout le problème de coloration de graphe avec une limite de temps.
+    Fonction qui résout le problème de coloration de graphe avec une limite de temps (gérée par le solveur).
     Utilise la bibliothèque PuLP pour formuler le problème comme un problème de programmation linéaire.
     """
     def solve_internal():
         num_nodes = graph.countNode()
-        num_edges = graph.countEdge()
+        # Voisins de chaque nœud, lus une seule fois (child_of[i - 1] pour le nœud i)
+        child_of = [graph.childNode_list(i) for i in range(1, num_nodes + 1)]
+
+        # Borne supérieure K du nombre chromatique obtenue par un DSATUR glouton :
+        # seules les couleurs 0..K-1 sont modélisées
+        K, _ = greedy_dsatur(graph.getGraph())
 
         # Création du problème de programmation linéaire
         problem = LpProblem("Graph_Coloring", LpMinimize)
@@ -27,71 +54,65 @@ def solve_with_timeout(graph, timeout):
         X = {
             (i, c): LpVariable(f"X_{i}_{c}", 0, 1, LpBinary)
             for i in range(num_nodes)
-            for c in range(num_nodes)
+            for c in range(K)
         }
 
         # Variable "used[c]" indique si la couleur c est utilisée
-        used = {c: LpVariable(f"used_{c}", 0, 1, LpBinary) for c in range(num_nodes)}
+        used = {c: LpVariable(f"used_{c}", 0, 1, LpBinary) for c in range(K)}
 
         # Objectif : minimiser le nombre de couleurs utilisées
-        problem += lpSum(used[c] for c in range(num_nodes)), "Minimize_Colors"
+        problem += lpSum(used[c] for c in range(K)), "Minimize_Colors"
 
         # Contrainte : chaque nœud doit avoir exactement une couleur
         for i in range(num_nodes):
-            problem += lpSum(X[(i, c)] for c in range(num_nodes)) == 1, f"One_Color_Node_{i}"
+            problem += lpSum(X[(i, c)] for c in range(K)) == 1, f"One_Color_Node_{i}"
 
         # Contrainte : les nœuds adjacents doivent avoir des couleurs différentes
         edge_count = 0
         for i in range(1, num_nodes + 1):
-            for j in graph.childNode(i):  # Récupérer les voisins du nœud i
+            for j in child_of[i - 1]:  # Voisins du nœud i
                 if i < j:  # Éviter de traiter chaque arête deux fois
-                    for c in range(num_nodes):
+                    for c in range(K):
                         problem += X[(i - 1, c)] + X[(j - 1, c)] <= 1, f"Diff_Color_Edge_{edge_count}_Color_{c}"
                     edge_count += 1
 
         # Contrainte : si un nœud utilise une couleur, alors cette couleur doit être marquée comme utilisée
         for i in range(num_nodes):
-            for c in range(num_nodes):
+            for c in range(K):
                 problem += X[(i, c)] <= used[c], f"Link_Node_{i}_Color_{c}"
 
-        # Résolution du problème avec le solveur CBC de PuLP
-        solver = PULP_CBC_CMD(msg=False, timeLimit=timeout)
+        # Résolution du problème avec HiGHS (dans le processus) ou CBC
+        solver = mip_solver(timeout)
         status = problem.solve(solver)
 
+        # Limite de temps atteinte : CBC comme HiGHS rapportent alors le statut "Optimal" dès
+        # qu'une solution entière existe (voire aucune pour HiGHS), seul sol_status indique
+        # si l'optimalité a été prouvée
+        if LpStatus[problem.status] in ("Not Solved", "Undefined") or problem.sol_status != LpSolutionOptimal:
+            print(f"\nTimeout occurred for {graph.name}")
+            return False, None, None
+
         # Vérification si la solution trouvée est optimale
         if LpStatus[problem.status] == "Optimal":
             coloring = {}
-            num_colors_used = sum(used[c].varValue for c in range(num_nodes))  # Nombre de couleurs utilisées
+            num_colors_used = sum(used[c].varValue for c in range(K))  # Nombre de couleurs utilisées
             for i in range(num_nodes):
-                for c in range(num_nodes):
+                for c in range(K):
                     if X[(i, c)].varValue > 0.5:  # Si la variable X[(i, c)] est active, le nœud i a la couleur c
                         coloring[i + 1] = c
                         break
             return True, coloring, num_colors_used
         return False, None, None  
 
-    result = [None]
-    start_time = time.time() 
-
-    def target():
-        """Fonction exécutée dans un thread, qui appelle la fonction de résolution."""
-        try:
-            result[0] = solve_internal()
-        except Exception as e:
-            print(f"\nError in solver for {graph.name}: {str(e)}")
-            result[0] = (False, None, None)
-
-    thread = threading.Thread(target=target)
-    thread.start()
-    thread.join(timeout)
-
+    start_time = time.time()
+    try:
+        # Le solveur applique lui-même la limite de temps (timeLimit)
+        status, coloring, n_colors = solve_internal()
+    except Exception as e:
+        print(f"\nError in solver for {graph.name}: {str(e)}")
+        status, coloring, n_colors = False, None, None
     duration = time.time() - start_time
 
-    if thread.is_alive():
-        print(f"\nTimeout occurred for {graph.name}")
-        return False, None, None, duration
-        
-    status, coloring, n_colors = result[0]
     return status, coloring, n_colors, duration
 
 def process_graph(graph):
@@ -110,27 +131,31 @@ def process_graph(graph):
         print(f"\nError processing {graph.name}: {str(e)}")
         return None
 
+def process_graph_by_name(name):
+    """Charge le graphe `name` dans le processus de travail puis le traite"""
+    return process_graph(ColorGraph.load(name))
+
 def main():
-    """Fonction principale qui charge les graphes, les traite en parallèle et affiche les résultats"""
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()]
-    list_g = sorted(list_g, key=lambda x: x.countNode())
+    """Fonction principale qui liste les graphes, les charge et les traite en parallèle puis affiche les résultats"""
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
     results = []
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_graph = {executor.submit(process_graph, graph): graph for graph in list_g}
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_name = {executor.submit(process_graph_by_name, name): name for name in names}
         
-        for future in as_completed(future_to_graph):
+        for future in as_completed(future_to_name):
             try:
                 result = future.result()
                 if result:
                     results.append(result)
             except Exception as e:
-                graph = future_to_graph[future]
-                print(f"\nUnexpected error for {graph.name}: {str(e)}")
+                name = future_to_name[future]
+                print(f"\nUnexpected error for {name}: {str(e)}")
 
     if results:
         print("\nSummary:")
-        print(f"Total graphs: {len(list_g)}")
+        print(f"Total graphs: {len(names)}")
         print(f"Solved: {sum(1 for r in results if r[4])}")
         avg_time = sum(r[3] for r in results) / len(results)
         print(f"Average time: {avg_time:.2f}s")
@@ -2,49 +2,86 @@ import sys
 import os
 import time
 from ortools.sat.python import cp_model
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.graph import ColorGraph
+from helpers.greedy_bounds import greedy_dsatur, greedy_clique_lower_bound, greedy_clique_cover
 
 TIMEOUT_SECONDS = 60
-MAX_WORKERS = 8
+SOLVER_WORKERS = 2  # threads CP-SAT par résolution
+MAX_WORKERS = max(1, (os.cpu_count() or 1) // SOLVER_WORKERS)  # résolutions en parallèle
 
-def solve(graph):
+def build_model(g, hints=True):
     """
-    Résout le problème de coloriage de graphe en utilisant le solveur CP-SAT d'OR-Tools.
-    - Définit des variables pour les couleurs des nœuds.
-    - Ajoute des contraintes pour garantir un coloriage valide.
-    - Minimise le nombre de couleurs utilisées.
+    Construit le modèle CP-SAT de coloriage du graphe `g`.
+    - hints : fournit la coloration DSATUR gloutonne comme indication (hint) au solveur.
+    Retourne le modèle, les variables de couleur des nœuds et la variable de couleur maximale.
     """
-    g = graph.getGraph()
     model = cp_model.CpModel()
-    num_nodes = len(g)
+
+    # Bornes du nombre chromatique : K par un DSATUR glouton, L par une clique gloutonne
+    K, greedy_coloring = greedy_dsatur(g)
+    L = greedy_clique_lower_bound(g)
 
     # Crée des variables de décision pour les couleurs des nœuds
-    colors = {node: model.NewIntVar(0, num_nodes - 1, f'color_{node}') for node in g}
-    max_color = model.NewIntVar(0, num_nodes - 1, 'max_color')
+    colors = {node: model.NewIntVar(0, K - 1, f'color_{node}') for node in g}
+    max_color = model.NewIntVar(max(L, 1) - 1, K - 1, 'max_color')
+
+    # La coloration gloutonne sert de point de départ à la recherche
+    if hints:
+        for node in g:
+            model.AddHint(colors[node], greedy_coloring[node])
+        model.AddHint(max_color, K - 1)
 
     # Ajoute des contraintes : les nœuds adjacents ne doivent pas partager la même couleur
-    added_edges = set()
-    for node in g:
-        for child in g[node]:
-            if (node, child) not in added_edges and (child, node) not in added_edges:
-                model.Add(colors[node] != colors[child])  # Enforce des couleurs différentes pour les nœuds adjacents
-                added_edges.add((node, child))
+    # Les arêtes sont couvertes par des cliques, chacune donnant une contrainte AllDifferent
+    cliques, edges = greedy_clique_cover(g)
+    for clique in cliques:
+        model.AddAllDifferent([colors[node] for node in clique])
+    for node, child in edges:
+        model.Add(colors[node] != colors[child])  # Enforce des couleurs différentes pour les nœuds adjacents
 
     # Ajoute des contraintes : la couleur de chaque nœud ne doit pas dépasser la couleur maximale
     for node in g:
         model.Add(colors[node] <= max_color)
 
+    # Brisure de symétrie : le nœud de plus haut degré prend la couleur 0
+    # et son voisin de plus haut degré l'une des deux premières couleurs
+    if g:
+        h = max(g, key=lambda node: len(g[node]))
+        model.Add(colors[h] == 0)
+        if g[h]:
+            h2 = max(g[h], key=lambda node: len(g[node]))
+            model.Add(colors[h2] <= 1)
+
     # Objectif : minimiser la couleur maximale utilisée
     model.Minimize(max_color)
+    return model, colors, max_color
+
+def solve(graph):
+    """
+    Résout le problème de coloriage de graphe en utilisant le solveur CP-SAT d'OR-Tools.
+    - Définit des variables pour les couleurs des nœuds.
+    - Ajoute des contraintes pour garantir un coloriage valide.
+    - Minimise le nombre de couleurs utilisées.
+    """
+    g = graph.getGraph()
+    model, colors, max_color = build_model(g)
 
     # Résout le modèle avec un délai d'attente
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = TIMEOUT_SECONDS
+    solver.parameters.num_search_workers = SOLVER_WORKERS
     st = time.time()
-    status = solver.Solve(model)
+    try:
+        status = solver.Solve(model)
+    except IndexError:
+        # Sur certaines instances (david), CP-SAT échoue (absl::btree_map::at) lorsque
+        # l'indication DSATUR est combinée aux cliques et aux couleurs fixées :
+        # le modèle est reconstruit sans indication
+        model, colors, max_color = build_model(g, hints=False)
+        status = solver.Solve(model)
     duration = time.time() - st  # Temps écoulé pour résoudre le modèle
 
     # Traite les résultats si une solution a été trouvée
@@ -92,27 +129,38 @@ def process_graph(graph):
 
     return (num_nodes, edge_density, duration, solved)
 
+def process_graph_by_name(name):
+    """
+    Charge le graphe `name` dans le processus de travail, puis le traite.
+    """
+    return process_graph(ColorGraph.load(name))
+
 def main():
     """
     Fonction principale :
-    - Charge et trie tous les graphes par le nombre de nœuds.
+    - Liste et trie tous les graphes par le nombre de nœuds, chargés à la demande.
     - Traite chaque graphe en parallèle.
     - Affiche un résumé des résultats.
     """
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()]
-    list_g = sorted(list_g, key=lambda x: x.countNode())
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
 
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_graph, graph): i for i, graph in enumerate(list_g)}
-        for future in futures:
-            stats = future.result()
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_name = {executor.submit(process_graph_by_name, name): name for name in names}
+        for future in as_completed(future_to_name):
+            # L'échec d'un graphe n'interrompt pas le traitement des autres
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"\nErreur inattendue pour {future_to_name[future]} : {str(e)}")
+                continue
             if stats:
                 results.append(stats)
 
     if results:
         print("\nRésumé :")
-        print(f"Total des graphes : {len(list_g)}")
+        print(f"Total des graphes : {len(names)}")
         print(f"Résolus : {sum(1 for r in results if r[3])}")
         avg_time = sum(r[2] for r in results) / len(results)
         print(f"Temps moyen : {avg_time:.2f}s")
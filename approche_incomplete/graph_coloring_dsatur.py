@@ -1,12 +1,12 @@
-from typing import Tuple, Optional
+from typing import Optional
 import sys
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
-import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.graph import ColorGraph
+from utils.csr import graph_csr, dsatur_csr, warm_up
 from helpers.solutions_stats import SolutionStats
 from helpers.solution_visualisation import visualize_resolution_time, visualize_solvability
 from helpers.solution_save import save_results_to_file
@@ -19,71 +19,28 @@ class GraphColoringSolver:
         self.graph = graph
         self.colors = {}
         self.max_color = None
-        self.uncolored_vertices = set(graph.getGraph().keys())
+        # Représentation CSR du graphe (celle de ColorGraph), le nœud v étant à l'indice v - 1
+        self.indptr, self.indices = graph_csr(graph)
 
-    def get_neighbors(self, vertex):
-        """ Récupère les voisins d'un sommet dans le graphe. """
-        return self.graph.getGraph().get(vertex, [])
-
-    def get_saturation_degree(self, vertex, color_assignment):
-        """
-        Calcul du degré de saturation d'un sommet (nombre de couleurs utilisées par ses voisins).
-        """
-        neighbors = self.get_neighbors(vertex)
-        colors_used = set()
-
-        for neighbor in neighbors:
-            if neighbor in color_assignment:
-                colors_used.add(color_assignment[neighbor])
-
-        return len(colors_used)
-
-    def dsatur_coloring(self):
+    def dsatur_coloring(self, max_colors: Optional[int] = None):
         """
         Algorithme de coloriage DSATUR pour résoudre le problème de coloriage de graphe.
         L'algorithme choisit le sommet avec le plus grand degré de saturation pour l'assigner à une couleur.
+        Le coloriage est effectué par un noyau Numba sur la représentation CSR du graphe.
+        Si `max_colors` est donné, retourne None dès qu'il faudrait plus de `max_colors` couleurs.
         """
-        color_assignment = {}
-        available_colors = {i for i in range(len(self.graph.getGraph()))} 
-        uncolored_vertices = self.uncolored_vertices.copy() 
-
-        # Initialisation : choisir un sommet arbitraire (le premier sommet de la liste)
-        first_vertex = next(iter(uncolored_vertices))
-        color_assignment[first_vertex] = 0
-        uncolored_vertices.remove(first_vertex)
-
-        while uncolored_vertices:
-            # Trouver le sommet avec la plus grande saturation
-            max_saturation = -1
-            vertex_to_color = None
-
-            # Parcourt les sommets non coloriés et trouve celui avec la plus grande saturation
-            for vertex in uncolored_vertices:
-                saturation = self.get_saturation_degree(vertex, color_assignment)
-                if saturation > max_saturation:
-                    max_saturation = saturation
-                    vertex_to_color = vertex
-                elif saturation == max_saturation:
-                    # En cas d'égalité, choisit celui avec le plus grand degré
-                    if len(self.get_neighbors(vertex)) > len(self.get_neighbors(vertex_to_color)):
-                        vertex_to_color = vertex
-
-            # Assigner la couleur la plus faible disponible pour ce sommet
-            neighbor_colors = set(color_assignment.get(neighbor) for neighbor in self.get_neighbors(vertex_to_color))
-            for color in available_colors:
-                if color not in neighbor_colors:
-                    color_assignment[vertex_to_color] = color
-                    break
-
-            uncolored_vertices.remove(vertex_to_color)
-
-        return color_assignment
-
-    def solve(self):
+        coloring = dsatur_csr(self.indptr, self.indices, max_colors or 0)
+        if (coloring < 0).any():
+            return None
+        return dict(enumerate(coloring.tolist(), start=1))
+
+    def solve(self, max_colors: Optional[int] = None):
         """
         Résout le problème de coloriage pour le graphe en utilisant l'algorithme DSATUR.
+        - max_colors : budget de couleurs (par exemple le nombre chromatique de référence) ;
+          le graphe n'est pas résolu si DSATUR le dépasse.
         """
-        if not self.graph.getGraph():
+        if self.graph.countNode() == 0:
             return SolutionStats(
                 status="INFEASIBLE",
                 coloring={},
@@ -95,14 +52,26 @@ class GraphColoringSolver:
             )
 
         start_time = time.time()
-        coloring = self.dsatur_coloring()
+        coloring = self.dsatur_coloring(max_colors)
         duration = time.time() - start_time
 
-        num_nodes = len(self.graph.getGraph())
-        num_edges = sum(len(neighbors) for neighbors in self.graph.getGraph().values()) // 2
+        num_nodes = self.graph.countNode()
+        num_edges = self.graph.countEdge()
         max_edges = (num_nodes * (num_nodes - 1)) // 2
         edge_density = num_edges / max_edges if max_edges > 0 else 0
 
+        # Budget de couleurs dépassé
+        if coloring is None:
+            return SolutionStats(
+                status="INFEASIBLE",
+                coloring=None,
+                num_colors=None,
+                duration=duration,
+                num_nodes=num_nodes,
+                edge_density=edge_density,
+                solved=False
+            )
+
         num_colors = len(set(coloring.values())) 
 
         solved = True if num_colors > 0 else False
@@ -134,33 +103,39 @@ def process_graph(graph):
             print(f"Couleurs utilisées: {stats.num_colors}")
         print(f"Temps: {stats.duration:.2f}s")
 
-        edges = list(graph.getGraph().items())
-        edges = [(node, child) for node, children in edges for child in children]
+        # Chaque arête (u, v) n'est listée qu'une fois, avec u < v
+        edges = [(node, child) for node, children in graph.getGraph().items() for child in children if child > node]
 
         save_results_to_file("results_dsatur", graph.name, stats, edges, status_name)
 
     return stats
 
+def process_graph_by_name(name):
+    """
+    Charge le graphe `name` dans le processus de travail, puis le traite.
+    """
+    return process_graph(ColorGraph.load(name))
+
 def main():
     """
     Fonction principale qui charge les graphes, les traite en parallèle et affiche un résumé.
     """
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()]
-    graphs = sorted(list_g, key=lambda x: x.countNode())
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
+    # Noyaux Numba compilés une seule fois, avant la création des processus de travail
+    warm_up()
 
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_graph, graph): i for i, graph in enumerate(graphs)
-        }
-        for future in futures:
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(process_graph_by_name, name) for name in names]
+        for future in as_completed(futures):
             stats = future.result()
             if stats:
                 results.append(stats)
 
     if results:
         print("\nRésumé :")
-        print(f"Total des graphes : {len(list_g)}")
+        print(f"Total des graphes : {len(names)}")
         print(f"Résolus : {sum(1 for r in results if r.solved)}")
         avg_time = sum(r.duration for r in results) / len(results)
         print(f"Temps moyen : {avg_time:.2f}s")
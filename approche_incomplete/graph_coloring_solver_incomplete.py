@@ -2,9 +2,8 @@ from typing import Tuple, Dict
 import os
 import sys
 import time
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor
-import random
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,11 +16,21 @@ TIMEOUT_SECONDS = 600
 MAX_WORKERS = 8
 
 class GraphColoringSolver:
-    def __init__(self, graph):
-        """Initialise le solveur avec un graphe donné."""
+    def __init__(self, graph, seed=0):
+        """Initialise le solveur avec un graphe donné et un générateur aléatoire de graine `seed`."""
         self.graph = graph
+        self.rng = np.random.default_rng(seed)
         self.num_nodes = graph.countNode()
         self.num_edges = graph.countEdge()
+        # Listes d'adjacence lues une seule fois et figées en tuples (itération plus rapide)
+        self.adj = {node: tuple(neighbors) for node, neighbors in graph.getGraph().items()}
+        # Voisinages sous forme d'ensembles, pour des tests d'appartenance en O(1)
+        self.adj_set = {node: set(neighbors) for node, neighbors in self.adj.items()}
+        # Bijection nœud <-> indice compact 0..n-1, utilisée par le tableau des probabilités
+        self.idx_to_node = np.fromiter(self.adj, dtype=np.int64, count=len(self.adj))
+        self.node_to_idx = {node: i for i, node in enumerate(self.adj)}
+        # Permutation des nœuds réutilisée (mélangée sur place) par la recherche locale
+        self.node_order = self.idx_to_node.copy()
 
     def calculate_conflicts(self, colors: Dict[int, int]) -> Tuple[int, set]:
         """
@@ -30,60 +39,77 @@ class GraphColoringSolver:
         """
         conflicts = 0
         conflict_nodes = set()
-        for node, neighbors in self.graph.getGraph().items():
+        for node, neighbors in self.adj.items():
+            node_color = colors[node]
             for neighbor in neighbors:
-                if neighbor in colors and colors[node] == colors[neighbor]:
+                # Chaque arête n'est examinée qu'une fois, depuis son extrémité de plus petit indice
+                if neighbor > node and colors[neighbor] == node_color:
                     conflicts += 1
                     conflict_nodes.add(node)
-        return conflicts // 2, conflict_nodes  # Diviser par 2 car chaque conflit est compté deux fois
+                    conflict_nodes.add(neighbor)
+        return conflicts, conflict_nodes
 
-    def select_next_node_probabilistic(self, available_nodes: set, probabilities: Dict[int, float]) -> int:
+    def select_next_node_probabilistic(self, available_mask: np.ndarray, probabilities: np.ndarray) -> int:
         """
-        Sélectionne un nœud parmi les nœuds disponibles, selon une distribution de probabilités.
+        Sélectionne un nœud parmi les nœuds disponibles (masque booléen indexé par indice compact),
+        selon une distribution de probabilités. Retourne l'indice compact du nœud choisi.
         """
-        nodes = list(available_nodes)
-        weights = [probabilities.get(node, 0) for node in nodes]  # Poids associés à chaque nœud
-        if sum(weights) == 0:
-            weights = [1.0 / len(nodes)] * len(nodes)  # Si aucune probabilité, attribuer des poids égaux
-        return random.choices(nodes, weights=weights, k=1)[0]  # Sélection aléatoire basée sur les poids
+        weights = probabilities * available_mask  # Poids associés à chaque nœud disponible
+        total = weights.sum()
+        if total == 0:
+            weights = available_mask / available_mask.sum()  # Si aucune probabilité, attribuer des poids égaux
+        else:
+            weights /= total
+        return self.rng.choice(weights.size, p=weights)  # Sélection aléatoire basée sur les poids
 
-    def find_solution(self, probabilities: Dict[int, float]) -> Tuple[Dict[int, int], int]:
+    def find_solution(self, probabilities: np.ndarray) -> Tuple[Dict[int, int], int]:
         """
         Trouve une solution initiale en utilisant une heuristique basée sur les probabilités.
         La stratégie choisit un nœud à colorier, puis colore un ensemble indépendant autour de ce nœud.
         """
+        adj = self.adj
+        node_to_idx = self.node_to_idx
         colors = {}
-        available_nodes = set(self.graph.getGraph().keys())
+        available_nodes = set(adj)
+        available_mask = np.ones(len(adj), dtype=bool)
         color = 0
 
         while available_nodes:
             # Sélectionne un nœud à colorier probabilistiquement
-            node = self.select_next_node_probabilistic(available_nodes, probabilities)
+            choice = self.select_next_node_probabilistic(available_mask, probabilities)
+            node = int(self.idx_to_node[choice])
             independent_set = {node}  # Ensemble indépendant de nœuds
+            # Nœuds adjacents à au moins un nœud de l'ensemble indépendant
+            blocked = set(self.adj_set[node])
             queue = deque([node])
             available_nodes.remove(node)
+            available_mask[choice] = False
 
             while queue:
                 # Défilement du nœud actuel
                 current_node = queue.popleft()
                 candidates = [
-                    neighbor for neighbor in self.graph.getGraph()[current_node]
-                    if neighbor in available_nodes and all(
-                        n not in self.graph.getGraph()[neighbor] for n in independent_set
-                    )
+                    neighbor for neighbor in adj[current_node]
+                    if neighbor in available_nodes and neighbor not in blocked
                 ]
                 for candidate in candidates:
                     independent_set.add(candidate)
+                    blocked |= self.adj_set[candidate]
                     queue.append(candidate)
                     available_nodes.remove(candidate)
+                    available_mask[node_to_idx[candidate]] = False
 
             # Assigne des couleurs aux nœuds de l'ensemble indépendant
             for node in independent_set:
-                possible_colors = set(range(color)) - {
-                    colors.get(neighbor) for neighbor in self.graph.getGraph()[node]
-                }
-                if possible_colors:
-                    colors[node] = min(possible_colors)  # Choisit la plus petite couleur disponible
+                # Couleurs des voisins déjà coloriés, sous forme de masque de bits
+                used = 0
+                for neighbor in adj[node]:
+                    c = colors.get(neighbor)
+                    if c is not None:
+                        used |= 1 << c
+                lowest = (~used & (used + 1)).bit_length() - 1  # Bit à 0 de poids le plus faible
+                if lowest < color:
+                    colors[node] = lowest  # Choisit la plus petite couleur disponible
                 else:
                     colors[node] = color  # Si aucune couleur possible, on crée une nouvelle couleur
                     color += 1
@@ -94,42 +120,95 @@ class GraphColoringSolver:
         """
         Réassigne aléatoirement les couleurs à un pourcentage de nœuds pour éviter les minima locaux.
         """
-        nodes = list(colors.keys())
-        random.shuffle(nodes)
-        num_to_reassign = int(len(nodes) * percentage)
-        for node in nodes[:num_to_reassign]:
-            colors[node] = random.randint(0, max(colors.values()))
+        self.rng.shuffle(self.node_order)
+        num_to_reassign = int(self.node_order.size * percentage)
+        for node in self.node_order[:num_to_reassign].tolist():
+            colors[node] = int(self.rng.integers(0, max(colors.values()) + 1))
         return colors
 
+    def neighbor_colors(self, colors: Dict[int, int]) -> Tuple[Dict[int, Counter], Dict[int, int]]:
+        """
+        Pour chaque nœud, compte ses voisins par couleur et construit le masque de bits
+        des couleurs présentes dans son voisinage.
+        """
+        counts = {}
+        forbidden = {}
+        for node, neighbors in self.adj.items():
+            node_counts = Counter(colors[neighbor] for neighbor in neighbors)
+            mask = 0
+            for color in node_counts:
+                mask |= 1 << color
+            counts[node] = node_counts
+            forbidden[node] = mask
+        return counts, forbidden
+
+    def move_node_color(self, counts: Dict[int, Counter], forbidden: Dict[int, int], node: int, old_color: int, new_color: int):
+        """
+        Met à jour les compteurs et masques des voisins d'un nœud passant de `old_color` à `new_color`.
+        """
+        for neighbor in self.adj[node]:
+            neighbor_counts = counts[neighbor]
+            neighbor_counts[old_color] -= 1
+            if neighbor_counts[old_color] == 0:
+                del neighbor_counts[old_color]
+                forbidden[neighbor] &= ~(1 << old_color)
+            neighbor_counts[new_color] += 1
+            forbidden[neighbor] |= 1 << new_color
+
     def local_search(self, colors: Dict[int, int], max_iterations: int = 50) -> Tuple[Dict[int, int], int]:
         """
         Améliore la solution obtenue en utilisant une recherche locale, en essayant de réduire le nombre de couleurs.
+        Les couleurs du voisinage de chaque nœud sont maintenues (compteurs et masques de bits) :
+        la plus petite couleur libre d'un nœud se lit directement dans son masque.
         """
         best_colors = colors.copy()
-        best_num_colors = max(colors.values()) + 1
+        # Nombre de nœuds par couleur et couleur maximale courante, mis à jour à chaque réaffectation
+        count = Counter(best_colors.values())
+        max_color = max(count)
+        best_num_colors = max_color + 1
+        neighbor_counts, forbidden = self.neighbor_colors(best_colors)
 
         for iteration in range(max_iterations):
             improved = False
-            nodes = list(best_colors.keys())
-            random.shuffle(nodes)
+            self.rng.shuffle(self.node_order)
 
-            for node in nodes:
+            for node in self.node_order.tolist():
                 original_color = best_colors[node]
-                for new_color in range(best_num_colors - 1):
-                    # Essaye de réaffecter la couleur du nœud sans créer de conflit
-                    if all(best_colors.get(neighbor) != new_color for neighbor in self.graph.getGraph()[node]):
-                        best_colors[node] = new_color
-                        break
-
-                current_num_colors = max(best_colors.values()) + 1
-                if current_num_colors < best_num_colors:
-                    best_num_colors = current_num_colors
+                # Essaye de réaffecter au nœud la plus petite couleur absente de son voisinage
+                free = ~forbidden[node]
+                new_color = (free & -free).bit_length() - 1
+                if new_color >= best_num_colors - 1:
+                    new_color = original_color
+
+                # Couleur maximale qu'aurait la coloration après la réaffectation
+                new_max = max_color
+                if new_color > max_color:
+                    new_max = new_color
+                elif new_color != original_color and original_color == max_color and count[max_color] == 1:
+                    new_max = max_color - 1
+                    while new_max > new_color and count[new_max] == 0:
+                        new_max -= 1
+
+                # La réaffectation n'est conservée que si elle réduit le nombre de couleurs
+                if new_max + 1 < best_num_colors:
+                    best_num_colors = new_max + 1
                     improved = True
-                else:
-                    best_colors[node] = original_color  # Restaure la couleur initiale du nœud
+                    if new_color != original_color:
+                        best_colors[node] = new_color
+                        count[original_color] -= 1
+                        count[new_color] += 1
+                        max_color = new_max
+                        self.move_node_color(neighbor_counts, forbidden, node, original_color, new_color)
 
             if not improved:
+                previous_colors = best_colors.copy()
                 best_colors = self.random_reassign_colors(best_colors)  # Si aucune amélioration, réassigner les couleurs aléatoirement
+                count = Counter(best_colors.values())
+                max_color = max(count)
+                # Seuls les voisins des nœuds réaffectés voient leurs couleurs changer
+                for node, color in best_colors.items():
+                    if color != previous_colors[node]:
+                        self.move_node_color(neighbor_counts, forbidden, node, previous_colors[node], color)
 
         return best_colors, best_num_colors
 
@@ -150,7 +229,7 @@ class GraphColoringSolver:
 
         start_time = time.time()
         # Probabilités initiales égales pour chaque nœud
-        probabilities = {node: 1.0 / self.num_nodes for node in self.graph.getGraph().keys()}
+        probabilities = np.full(len(self.adj), 1.0 / len(self.adj))
         best_solution = None
         best_num_colors = self.num_nodes
 
@@ -164,11 +243,10 @@ class GraphColoringSolver:
             # Calcule les conflits et ajuste les probabilités pour les nœuds impliqués dans des conflits
             _, conflict_nodes = self.calculate_conflicts(solution)
             for node in conflict_nodes:
-                probabilities[node] += 0.1  # Augmente la probabilité pour les nœuds en conflit
-            total_probability = sum(probabilities.values())
+                probabilities[self.node_to_idx[node]] += 0.1  # Augmente la probabilité pour les nœuds en conflit
+            total_probability = probabilities.sum()
             if total_probability > 0:
-                for node in probabilities:
-                    probabilities[node] /= total_probability  # Normalise les probabilités
+                probabilities /= total_probability  # Normalise les probabilités
 
         # Améliore la solution obtenue avec une recherche locale
         if best_solution:
@@ -203,31 +281,33 @@ def process_graph(graph):
             print(f"Couleurs utilisées: {stats.num_colors}")
         print(f"Temps: {stats.duration:.2f}s")
 
-        edges = list(graph.getGraph().items())
-        edges = [(node, child) for node, children in edges for child in children]
+        # Chaque arête (u, v) n'est listée qu'une fois, avec u < v
+        edges = [(node, child) for node, children in graph.getGraph().items() for child in children if child > node]
 
         save_results_to_file("results_incomplete", graph.name, stats, edges, "OPTIMAL" if stats.solved else "INFEASIBLE")
 
     return stats
 
+def process_graph_by_name(name):
+    """ Charge le graphe `name` dans le processus de travail, puis le traite. """
+    return process_graph(ColorGraph.load(name))
+
 def main():
     """ Point d'entrée du programme pour traiter plusieurs graphes. """
-    list_g = [ColorGraph.load(name) for name in ColorGraph.list_name()] 
-    graphs = sorted(list_g, key=lambda x: x.countNode())
+    # Les graphes sont chargés dans les processus de travail, du plus petit au plus grand
+    names = sorted(ColorGraph.list_name(), key=ColorGraph.peek_size)
 
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_graph, graph): i for i, graph in enumerate(graphs)
-        } 
-        for future in futures:
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(process_graph_by_name, name) for name in names]
+        for future in as_completed(futures):
             stats = future.result(timeout=TIMEOUT_SECONDS)
             if stats:
                 results.append(stats)
 
     if results:
         print("\nRésumé:")
-        print(f"Total des graphes : {len(list_g)}")
+        print(f"Total des graphes : {len(names)}")
         print(f"Résolus : {sum(1 for r in results if r.solved)}")
         avg_time = sum(r.duration for r in results) / len(results)
         print(f"Temps moyen : {avg_time:.2f}s")
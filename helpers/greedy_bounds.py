@@ -0,0 +1,111 @@
+import heapq
+
+def adjacency_bits(g):
+    """
+    Adjacence sous forme de masques de bits (entiers Python) : le bit j du masque d'indice i
+    vaut 1 si les nœuds aux positions i et j de `g` sont voisins.
+    Intersections et cardinaux deviennent des opérations `&` et `bit_count()` sur des mots machine.
+    """
+    position = {node: i for i, node in enumerate(g)}
+    bits = []
+    for i, node in enumerate(g):
+        mask = 0
+        for child in g[node]:
+            mask |= 1 << position[child]
+        bits.append(mask & ~(1 << i))
+    return bits
+
+def iter_bits(mask):
+    """ Indices des bits à 1 d'un masque, par ordre croissant. """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def greedy_dsatur(g):
+    """
+    Coloration gloutonne DSATUR, utilisée comme borne supérieure du nombre chromatique.
+    - g : dictionnaire d'adjacence {nœud: liste des voisins}.
+    Retourne le nombre de couleurs K utilisées et l'affectation {nœud: couleur}.
+    """
+    assignment = {}
+    # Couleurs du voisinage de chaque nœud, sous forme de masque de bits
+    saturation = {node: 0 for node in g}
+    heap = [(0, -len(g[node]), node) for node in g]
+    heapq.heapify(heap)
+
+    while heap:
+        sat, _, node = heapq.heappop(heap)
+        # Ignore les entrées obsolètes (nœud déjà colorié ou saturation modifiée)
+        if node in assignment or -sat != saturation[node].bit_count():
+            continue
+
+        # Plus petite couleur absente du voisinage : bit à 0 de poids le plus faible
+        used = saturation[node]
+        color = (~used & (used + 1)).bit_length() - 1
+        assignment[node] = color
+
+        for neighbor in g[node]:
+            if neighbor not in assignment and not (saturation[neighbor] >> color) & 1:
+                saturation[neighbor] |= 1 << color
+                heapq.heappush(heap, (-saturation[neighbor].bit_count(), -len(g[neighbor]), neighbor))
+
+    num_colors = max(assignment.values()) + 1 if assignment else 0
+    return num_colors, assignment
+
+def greedy_clique_lower_bound(g):
+    """
+    Borne inférieure L du nombre chromatique : taille d'une clique construite de façon gloutonne.
+    Depuis chaque sommet (par degré décroissant), on ajoute tant que possible le candidat
+    ayant le plus de voisins parmi les candidats restants.
+    """
+    bits = adjacency_bits(g)
+    degree = [mask.bit_count() for mask in bits]
+    best = 0
+
+    for start in sorted(range(len(bits)), key=degree.__getitem__, reverse=True):
+        # Aucune clique contenant ce sommet ne peut dépasser la meilleure trouvée
+        if degree[start] + 1 <= best:
+            break
+        size = 1
+        candidates = bits[start]
+        while candidates:
+            node = max(iter_bits(candidates), key=lambda v: (bits[v] & candidates).bit_count())
+            candidates &= bits[node]
+            size += 1
+        best = max(best, size)
+
+    return best
+
+def greedy_clique_cover(g):
+    """
+    Couverture gloutonne des arêtes du graphe par des cliques.
+    Tant qu'un sommet (pris par degré décroissant) a des arêtes non couvertes, on construit
+    une clique à partir de l'une d'elles en ajoutant le candidat ayant le plus d'arêtes non couvertes.
+    Retourne les cliques de taille >= 3 et la liste des arêtes (u, v) restantes.
+    """
+    adj = {node: set(g[node]) - {node} for node in g}
+    uncovered = {node: set(adj[node]) for node in g}
+    cliques = []
+    edges = []
+
+    for start in sorted(adj, key=lambda node: len(adj[node]), reverse=True):
+        while uncovered[start]:
+            second = max(uncovered[start], key=lambda n: len(uncovered[n]))
+            clique = [start, second]
+            candidates = adj[start] & adj[second]
+            while candidates:
+                node = max(candidates, key=lambda n: len(uncovered[n]))
+                clique.append(node)
+                candidates &= adj[node]
+
+            # Toutes les arêtes internes à la clique sont désormais couvertes
+            for u in clique:
+                uncovered[u].difference_update(clique)
+
+            if len(clique) > 2:
+                cliques.append(clique)
+            else:
+                edges.append((start, second))
+
+    return cliques, edges
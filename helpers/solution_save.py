@@ -1,16 +1,15 @@
-from helpers.solutions_stats import SolutionStats
 import json
 import numpy as np
 
-def convert_int64_to_int(obj):
-    if isinstance(obj, dict):
-        return {convert_int64_to_int(k): convert_int64_to_int(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_int64_to_int(item) for item in obj]
-    elif isinstance(obj, np.int64):
-        return int(obj)
-    else:
-        return obj
+class _NpEncoder(json.JSONEncoder):
+    """ Convertit à la volée les scalaires NumPy rencontrés lors de l'écriture JSON. """
+
+    def default(self, o):
+        if isinstance(o, np.integer):
+            return int(o)
+        if isinstance(o, np.floating):
+            return float(o)
+        return super().default(o)
 
 def save_results_to_file(folder_name,graph_name, stats, edges, status_name):
     result = {
@@ -24,6 +23,5 @@ def save_results_to_file(folder_name,graph_name, stats, edges, status_name):
         "solved": stats.solved,
         "edges": edges
     }
-    result = convert_int64_to_int(result)
-    with open(f"{folder_name}/{graph_name}_results.json", "w") as f:
-        json.dump(result, f, indent=4)
\ No newline at end of file
+    with open(f"{folder_name}/{graph_name}_results.json", "w", buffering=1 << 20) as f:
+        json.dump(result, f, cls=_NpEncoder, indent=4)
@@ -3,10 +3,12 @@ from typing import Optional, Dict
 
 @dataclass
 class SolutionStats:
+    __slots__ = ('status', 'coloring', 'num_colors', 'duration', 'num_nodes', 'edge_density', 'solved')
+
     status: int
     coloring: Optional[Dict[int, int]]
     num_colors: Optional[int]
     duration: float
     num_nodes: int
     edge_density: float
-    solved: bool
\ No newline at end of file
+    solved: bool
@@ -1,10 +1,41 @@
 import json
 import networkx as nx
 import matplotlib.pyplot as plt
-import json
 import os
 from statistics import mean
-import math
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Positions spring_layout déjà calculées, par nom de graphe
+_LAYOUT_CACHE = {}
+
+def load_json(path):
+    """ Charge un fichier JSON, avec orjson s'il est installé (plus rapide que json). """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path) as f:
+        return json.load(f)
+
+def list_result_files(folder):
+    """ Noms des fichiers d'un dossier de résultats. """
+    with os.scandir(folder) as it:
+        return {entry.name for entry in it if entry.is_file()}
+
+def load_result_pairs(first_dir, second_dir, filenames):
+    """
+    Charge, pour chaque fichier, les résultats des deux dossiers.
+    Les lectures sont faites en parallèle par des threads (attente disque, GIL relâché).
+    """
+    def load_pair(filename):
+        return load_json(os.path.join(first_dir, filename)), load_json(os.path.join(second_dir, filename))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        yield from executor.map(load_pair, filenames)
 
 def visualize_coloring(filename):
     with open(filename, "r") as f:
@@ -22,7 +53,10 @@ def visualize_coloring(filename):
         return
 
     plt.figure(figsize=(10, 7))
-    pos = nx.spring_layout(G)
+    pos = _LAYOUT_CACHE.get(data["graph_name"])
+    if pos is None:
+        pos = nx.spring_layout(G, seed=0)
+        _LAYOUT_CACHE[data["graph_name"]] = pos
 
 
     nx.draw_networkx_edges(G, pos, edge_color='black')
@@ -97,21 +131,14 @@ def analyze_results(results_dir, results_optimized_dir, method_1, method_2):
         'both_solved': 0
     }
     
-    result_files = set(os.listdir(results_dir))
-    optimized_files = set(os.listdir(results_optimized_dir))
-    common_files = result_files.intersection(optimized_files)
+    common_files = list_result_files(results_dir) & list_result_files(results_optimized_dir)
     
     results_durations = []
     optimized_durations = []
     
     stats['total_instances'] = len(common_files)
     
-    for filename in common_files:
-        with open(os.path.join(results_dir, filename)) as f:
-            result_data = json.load(f)
-        with open(os.path.join(results_optimized_dir, filename)) as f:
-            optimized_data = json.load(f)
-            
+    for result_data, optimized_data in load_result_pairs(results_dir, results_optimized_dir, common_files):
         result_solved = result_data.get('solved', False) or result_data.get('status') == 'FEASIBLE'
         optimized_solved = optimized_data.get('solved', False) or optimized_data.get('status') == 'FEASIBLE'
         
@@ -169,9 +196,7 @@ def analyze_incomplete_vs_complete(results_dir, incomplete_results_dir):
         'both_solved': 0,
     }
     
-    result_files = set(os.listdir(results_dir))
-    incomplete_files = set(os.listdir(incomplete_results_dir))
-    common_files = result_files.intersection(incomplete_files)
+    common_files = list_result_files(results_dir) & list_result_files(incomplete_results_dir)
     
     complete_durations = []
     incomplete_durations = []
@@ -179,12 +204,7 @@ def analyze_incomplete_vs_complete(results_dir, incomplete_results_dir):
     
     stats['total_instances'] = len(common_files)
     
-    for filename in common_files:
-        with open(os.path.join(results_dir, filename)) as f:
-            complete_data = json.load(f)
-        with open(os.path.join(incomplete_results_dir, filename)) as f:
-            incomplete_data = json.load(f)
-            
+    for complete_data, incomplete_data in load_result_pairs(results_dir, incomplete_results_dir, common_files):
         complete_solved = complete_data.get('solved', False) or complete_data.get('status') == 'FEASIBLE'
         incomplete_solved = incomplete_data.get('solved', False)
         
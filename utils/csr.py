@@ -0,0 +1,132 @@
+import numpy as np
+from numba import njit
+
+
+def graph_csr(graph):
+    """
+    Représentation CSR d'un ColorGraph attendue par les noyaux : pointeurs de ligne (taille n+1)
+    et voisins (taille 2m) indexés de 0 à n-1, c'est-à-dire le nœud v à l'indice v - 1.
+    Les tableaux sont ceux du graphe, seuls les identifiants des voisins sont décalés.
+    """
+    _, offsets, neighbors = graph.to_csr()
+    return offsets, neighbors - 1
+
+
+@njit(cache=True)
+def compute_degrees(indptr):
+    """ Degré de chaque sommet. """
+    n = indptr.size - 1
+    degrees = np.empty(n, dtype=np.int32)
+    for i in range(n):
+        degrees[i] = indptr[i + 1] - indptr[i]
+    return degrees
+
+
+@njit(cache=True)
+def compute_saturation_order(indptr, indices):
+    """
+    Ordre des sommets par nombre de voisins distincts décroissant
+    (tri stable : à égalité, l'ordre d'origine est conservé).
+    """
+    n = indptr.size - 1
+    distinct = np.zeros(n, dtype=np.int32)
+    for i in range(n):
+        row = np.sort(indices[indptr[i]:indptr[i + 1]])
+        for k in range(row.size):
+            if k == 0 or row[k] != row[k - 1]:
+                distinct[i] += 1
+    return np.argsort(-distinct, kind='mergesort')
+
+
+@njit(cache=True)
+def edge_list(indptr, indices):
+    """ Liste des arêtes (i, j) avec i < j, sous forme d'un tableau (m, 2). """
+    n = indptr.size - 1
+    count = 0
+    for i in range(n):
+        for k in range(indptr[i], indptr[i + 1]):
+            if i < indices[k]:
+                count += 1
+    edges = np.empty((count, 2), dtype=np.int32)
+    e = 0
+    for i in range(n):
+        for k in range(indptr[i], indptr[i + 1]):
+            if i < indices[k]:
+                edges[e, 0] = i
+                edges[e, 1] = indices[k]
+                e += 1
+    return edges
+
+
+@njit(cache=True)
+def dsatur_csr(indptr, indices, max_colors=0):
+    """
+    Coloration DSATUR : le premier sommet est colorié en premier, puis à chaque étape le sommet
+    non colorié de plus grande saturation (puis de plus grand degré, puis d'indice le plus petit)
+    reçoit la plus petite couleur absente de son voisinage.
+    Les couleurs du voisinage de chaque sommet sont stockées sous forme de masques de bits
+    (un mot de 64 bits par tranche de 64 couleurs).
+    Si `max_colors` > 0, le coloriage s'arrête dès qu'une couleur >= max_colors serait nécessaire.
+    Retourne la couleur de chaque sommet (tableau de taille n, -1 pour les sommets non coloriés).
+    """
+    n = indptr.size - 1
+    coloring = np.full(n, -1, dtype=np.int32)
+    if n == 0:
+        return coloring
+    degrees = compute_degrees(indptr)
+    # La couleur d'un sommet ne dépasse jamais son degré
+    words = (degrees.max() + 1 + 63) // 64
+    sat_mask = np.zeros((n, words), dtype=np.uint64)
+    sat_count = np.zeros(n, dtype=np.int32)
+    colored = np.zeros(n, dtype=np.uint8)
+    one = np.uint64(1)
+
+    for step in range(n):
+        # Sommet non colorié de plus grande saturation, puis de plus grand degré.
+        # Comme dans la version Python d'origine, le coloriage commence par le premier sommet
+        # (et non par celui de plus grand degré), pour que les résultats restent comparables
+        best = 0 if step == 0 else -1
+        if step > 0:
+            for v in range(n):
+                if colored[v] == 0 and (best < 0 or sat_count[v] > sat_count[best]
+                                        or (sat_count[v] == sat_count[best] and degrees[v] > degrees[best])):
+                    best = v
+
+        # Plus petite couleur absente du voisinage : premier bit à 0 des masques
+        color = 0
+        for w in range(words):
+            free = ~sat_mask[best, w]
+            if free != 0:
+                b = 0
+                while (free >> np.uint64(b)) & one == 0:
+                    b += 1
+                color = w * 64 + b
+                break
+        if max_colors > 0 and color >= max_colors:
+            return coloring
+        coloring[best] = color
+        colored[best] = 1
+
+        w = color // 64
+        bit = one << np.uint64(color % 64)
+        for k in range(indptr[best], indptr[best + 1]):
+            u = indices[k]
+            if colored[u] == 0 and sat_mask[u, w] & bit == 0:
+                sat_mask[u, w] |= bit
+                sat_count[u] += 1
+
+    return coloring
+
+
+def warm_up():
+    """
+    Compile (ou charge depuis le cache disque) tous les noyaux sur un graphe minimal.
+    À appeler dans le processus principal avant de créer les processus de travail :
+    ceux-ci héritent alors des noyaux compilés au lieu de les compiler chacun de leur côté.
+    """
+    indptr = np.array([0, 1, 2], dtype=np.int32)
+    indices = np.array([1, 0], dtype=np.int32)
+    compute_degrees(indptr)
+    compute_saturation_order(indptr, indices)
+    edge_list(indptr, indices)
+    dsatur_csr(indptr, indices, 0)
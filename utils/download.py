@@ -1,39 +1,160 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
+import io
 import os
+import shutil
 import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 URL_ARCHIVE = "https://mat.tepper.cmu.edu/COLOR/instances/instances.tar"
 DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "datasets")
+TIMEOUT_SECONDS = 60
+MAX_RETRIES = 5  # nouvelles tentatives en cas d'échec de connexion ou d'erreur 502/503/504
+READ_BUFFER_SIZE = 256 * 1024  # lecture du flux HTTP par blocs de 256 Kio
+COPY_BUFFER_SIZE = 2 * 1024 * 1024  # copie du contenu de chaque fichier par blocs de 2 Mio
+WRITE_WORKERS = 4  # threads d'écriture des membres extraits
+
+
+def _write(path, payload):
+    with open(path, 'wb') as file:
+        file.write(payload)
+
+
+def _target(member, root):
+    """
+    Chemin de destination d'un membre de l'archive, refusé s'il sort du dossier `root`.
+    """
+    root = os.path.abspath(root)
+    path = os.path.abspath(os.path.join(root, member.name))
+    if os.path.commonpath([root, path]) != root:
+        raise tarfile.TarError(f"Membre hors du dossier cible : {member.name}")
+    return path
+
+
+def _session():
+    """
+    Session HTTP à connexion unique, qui relance automatiquement la requête en cas d'échec
+    de connexion ou de réponse 502/503/504.
+    """
+    retries = Retry(total=MAX_RETRIES, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retries)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _extract(stream, root):
+    """
+    Extrait l'archive tar lue depuis `stream` dans le dossier `root`.
+    Retourne le nombre de membres lus, la liste des échecs (nom, erreur) et les chemins
+    (relatifs à `root`) des membres extraits. Une archive illisible lève tarfile.TarError.
+    """
+    # Le thread principal lit les en-têtes et le contenu des membres ; les fichiers sont
+    # écrits par un groupe de threads. Les dossiers sont créés ici, avant toute écriture.
+    count = 0
+    failed = []
+    writes = []
+    extracted = []
+    with tarfile.open(fileobj=stream, mode="r|", copybufsize=COPY_BUFFER_SIZE) as file, \
+            ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        for member in file:
+            count += 1
+            try:
+                path = _target(member, root)
+                if member.isdir():
+                    os.makedirs(path, exist_ok=True)
+                elif member.isfile():
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    writes.append((member.name, path, pool.submit(_write, path, file.extractfile(member).read())))
+                    continue
+                else:
+                    file.extract(member, root)
+                extracted.append(os.path.relpath(path, root))
+            except (tarfile.TarError, OSError) as e:
+                failed.append((member.name, e))
+        
+        for name, path, write in writes:
+            try:
+                write.result()
+                extracted.append(os.path.relpath(path, root))
+            except OSError as e:
+                failed.append((name, e))
+    return count, failed, extracted
+
+
+def _install(root, extracted):
+    """
+    Déplace les membres extraits dans `root` vers le dossier des graphes.
+    Retourne la liste des échecs (nom, erreur).
+    """
+    failed = []
+    for name in extracted:
+        source = os.path.join(root, name)
+        target = os.path.join(DATASET_PATH, name)
+        try:
+            if os.path.isdir(source) and not os.path.islink(source):
+                os.makedirs(target, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(source, target)
+        except OSError as e:
+            failed.append((name, e))
+    return failed
 
 
 def download():
     os.makedirs(DATASET_PATH, exist_ok=True)
     
-    print("Téléchargement...")
-    print(f"\t{URL_ARCHIVE}", end="\t")
-    response = requests.get(URL_ARCHIVE)
-    if response.status_code != 200:
-        print("\x1b[31mFAILED\x1b[0m")
-        return
-    
-    archive_path = os.path.join(DATASET_PATH, "instances.tar")
-    with open(archive_path, "wb") as file:
-        file.write(response.content)
-    print("\x1b[32mOK\x1b[0m")
+    with _session() as session:
+        print("Téléchargement...")
+        print(f"\t{URL_ARCHIVE}", end="\t")
+        response = session.get(URL_ARCHIVE, stream=True, timeout=TIMEOUT_SECONDS)
+        if response.status_code != 200:
+            print("\x1b[31mFAILED\x1b[0m")
+            return
+        print("\x1b[32mOK\x1b[0m")
+        
+        # L'archive est extraite au fil du téléchargement (mode flux "r|") dans un dossier
+        # temporaire voisin (même système de fichiers) : les fichiers ne sont déplacés dans le
+        # dossier des graphes qu'une fois l'archive reçue en entier, sinon rien n'est conservé
+        print("Extraction...")
+        staging = tempfile.mkdtemp(prefix=".download-", dir=os.path.dirname(os.path.abspath(DATASET_PATH)))
+        try:
+            with response:
+                response.raw.decode_content = True
+                stream = io.BufferedReader(response.raw, buffer_size=READ_BUFFER_SIZE)
+                try:
+                    count, failed, extracted = _extract(stream, staging)
+                    # Lecture du remplissage qui suit la fin de l'archive, pour contrôler la taille reçue
+                    # (le flux se ferme de lui-même une fois la réponse entièrement lue)
+                    while not stream.closed and stream.read(READ_BUFFER_SIZE):
+                        pass
+                except tarfile.TarError as e:
+                    raise OSError(f"Archive illisible : {e}") from e
+                except ProtocolError as e:
+                    # Connexion coupée avant la fin de la réponse annoncée (Content-Length)
+                    raise OSError(f"Archive incomplète : {e}") from e
+                received = response.raw.tell()
+            
+            # Téléchargement interrompu : l'archive reçue est tronquée
+            expected = response.headers.get("Content-Length")
+            if expected is not None and received != int(expected):
+                raise OSError(f"Archive incomplète : {received} octets reçus sur {expected} attendus")
+            
+            failed += _install(staging, extracted)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
     
-    print("Extraction...")
-    with tarfile.open(archive_path) as file:
-        for member in file.getmembers():
-            file_path = os.path.join(DATASET_PATH, member.name)
-            print(f"\t{member.name}", end="\t")
-            try:
-                file.extract(member, DATASET_PATH)
-                print("\x1b[32mOK\x1b[0m")
-            except:
-                print("\x1b[31mFAILED\x1b[0m")
-                
-    os.remove(archive_path)
+    # Seuls les échecs sont affichés, suivis d'un bilan global
+    for name, error in failed:
+        print(f"\t{name}\t\x1b[31mFAILED\x1b[0m ({error})")
+    print(f"\t{count - len(failed)}/{count} membres extraits", end="\t")
+    print("\x1b[32mOK\x1b[0m" if not failed else "\x1b[31mFAILED\x1b[0m")
     
     
 if __name__ == "__main__":
-    download()
\ No newline at end of file
+    download()
@@ -1,77 +1,302 @@
 import os
+import re
+import zipfile
+from functools import cached_property, lru_cache
+import numpy as np
 from .download import DATASET_PATH
 
+# Ligne d'en-tête 'p edge N M' et lignes d'arête 'e u v' d'un fichier DIMACS
+_HEADER_LINE = re.compile(rb"^p\s+\S+\s+(\d+)", re.MULTILINE)
+_EDGE_LINE = re.compile(rb"^e\s+(\d+)\s+(\d+)", re.MULTILINE)
+# Nombre de couleurs suivies par le masque des couleurs utilisées (16 mots de 64 bits)
+MAX_MASK_COLORS = 1024
+# Taille maximale (en octets) de la matrice d'adjacence en bits construite au chargement
+ADJ_BITS_MAX_BYTES = 16 * 1024 * 1024
+# Version du format CSR produit par ColorGraph.parse, enregistrée dans les caches .npz
+PARSER_VERSION = 1
+# Dossier des caches .npz, distinct de celui des graphes : y écrire ne modifie pas la date
+# de modification de DATASET_PATH, qui sert de clé aux listes de fichiers mises en cache
+CACHE_PATH = os.path.join(os.path.dirname(DATASET_PATH), "cache")
+
 class ColorGraph:
     @staticmethod
-    def list_file():
+    def _dataset_version():
+        """
+        Date de modification du dossier des graphes : elle change dès qu'un fichier y est
+        ajouté ou supprimé, ce qui invalide les listes mises en cache.
+        """
         os.makedirs(DATASET_PATH, exist_ok=True)
-        ls = os.listdir(DATASET_PATH)
-        return [file for file in ls if file.endswith(".col")]
+        return os.stat(DATASET_PATH).st_mtime_ns
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _files(version):
+        with os.scandir(DATASET_PATH) as entries:
+            return tuple(sorted(entry.name for entry in entries if entry.name.endswith(".col") and entry.is_file()))
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _names(version):
+        return frozenset(os.path.splitext(file)[0] for file in ColorGraph._files(version))
+    
+    @staticmethod
+    def list_file():
+        return list(ColorGraph._files(ColorGraph._dataset_version()))
     
     @staticmethod
     def list_name():
         ls = ColorGraph.list_file()
         return [os.path.splitext(file)[0] for file in ls]
     
+    @staticmethod
+    def exists(name):
+        return name in ColorGraph._names(ColorGraph._dataset_version())
+    
     @staticmethod
     def load(name):
-        if name not in ColorGraph.list_name():
+        if not ColorGraph.exists(name):
             raise FileNotFoundError(f"Dataset '{name}' not found in {DATASET_PATH}")
         return ColorGraph(name)
     
     @staticmethod
-    def parse(file_content):
-        graph = {}
-        num_vertices = 0
-        for line in file_content.split("\n"):
-            if line.startswith("p"):
-                num_vertices = int(line.split()[2])
-                for i in range(1, num_vertices + 1):
-                    graph[i] = []
-            elif line.startswith("e"):
-                _, node1, node2 = line.split()
-                node1, node2 = int(node1), int(node2)
-                graph[node1].append(node2)
-                graph[node2].append(node1)
-        return graph
+    def peek_size(name):
+        """
+        Nombre de sommets annoncé par la ligne d'en-tête 'p edge N M', sans lire les arêtes.
+        """
+        with open(os.path.join(DATASET_PATH, name + ".col"), 'r') as file:
+            for line in file:
+                if line.startswith("p"):
+                    return int(line.split()[2])
+                if line.startswith("e"):
+                    break
+        return 0
+    
+    @staticmethod
+    def parse(data):
+        """
+        Construit la représentation CSR du graphe à partir du contenu (bytes) d'un fichier DIMACS.
+        Les voisins du nœud v (numérotés de 1 à N) sont neighbors[offsets[v - 1]:offsets[v]],
+        dans l'ordre d'apparition des arêtes du fichier.
+        """
+        header = _HEADER_LINE.search(data)
+        num_vertices = int(header.group(1)) if header else 0
+        # Arêtes (E, 2), extraites en une seule passe de l'expression régulière
+        edges = np.array(_EDGE_LINE.findall(data), dtype=np.bytes_).astype(np.int32).reshape(-1, 2)
+        
+        # Chaque arête (a, b) donne les entrées a -> b puis b -> a ; un tri stable par origine
+        # regroupe les voisins de chaque nœud en conservant l'ordre du fichier
+        sources = edges.ravel()
+        targets = edges[:, ::-1].ravel()
+        order = np.argsort(sources, kind='stable')
+        degrees = np.bincount(sources, minlength=num_vertices + 1)
+        offsets = np.zeros(num_vertices + 1, dtype=np.int32)
+        np.cumsum(degrees[1:], out=offsets[1:])
+        return offsets, targets[order]
     
     
     def __init__(self, name):
-        if name not in ColorGraph.list_name():
+        if not ColorGraph.exists(name):
             raise FileNotFoundError(f"Dataset '{name}' not found in {DATASET_PATH}")
         self.filepath = os.path.join(DATASET_PATH, name + ".col")
         self.name = name
-        with open(self.filepath, 'r') as file:
-            self.graph = self.parse(file.read())
-        self.colors = {k: 0 for k in self.graph}
-                    
+        # Le fichier n'est analysé qu'au premier accès à la représentation CSR
+        self._graph = None
+    
+    @cached_property
+    def _csr(self):
+        return self.read_csr()
+    
+    @cached_property
+    def offsets(self):
+        return self._csr[0]
+    
+    @cached_property
+    def neighbors(self):
+        return self._csr[1]
+    
+    @cached_property
+    def degree(self):
+        """
+        Degré de chaque nœud v, à l'indice v - 1.
+        """
+        return np.diff(self.offsets).astype(np.int32)
+    
+    @cached_property
+    def colors(self):
+        """
+        Couleur de chaque nœud, indexée par son numéro (la case 0 est inutilisée).
+        """
+        return np.zeros(self.offsets.size, dtype=np.int32)
+    
+    @cached_property
+    def adj_bits(self):
+        return self.build_adj_bits()
+    
+    @cached_property
+    def _header_nodes(self):
+        return self.peek_size(self.name)
+            
+    def read_csr(self):
+        """
+        Représentation CSR du fichier, lue depuis le cache '<CACHE_PATH>/<nom>.npz' s'il est
+        à jour (même version du parseur, plus récent que le fichier). Sinon le fichier est
+        analysé et le cache réécrit.
+        """
+        cache = os.path.join(CACHE_PATH, self.name + ".npz")
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(self.filepath):
+            try:
+                with np.load(cache) as data:
+                    if int(data["version"]) == PARSER_VERSION:
+                        return data["offsets"], data["neighbors"]
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                pass
+        
+        with open(self.filepath, 'rb') as file:
+            offsets, neighbors = self.parse(file.read())
+        # Écriture dans un fichier temporaire puis renommage : un autre processus
+        # ne peut pas lire un cache incomplet
+        tmp = f"{cache}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CACHE_PATH, exist_ok=True)
+            with open(tmp, 'wb') as file:
+                np.savez(file, version=PARSER_VERSION, offsets=offsets, neighbors=neighbors)
+            os.replace(tmp, cache)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return offsets, neighbors
             
+    def build_adj_bits(self):
+        """
+        Matrice d'adjacence sous forme de masques de bits : le bit v de la ligne u (mots np.uint64)
+        vaut 1 si u et v sont voisins. Comme pour self.colors, lignes et bits sont indexés par
+        le numéro du nœud (l'indice 0 est inutilisé). Retourne None si la matrice dépasse
+        ADJ_BITS_MAX_BYTES.
+        """
+        size = self.countNode() + 1
+        words = (size + 63) // 64
+        if size * words * 8 > ADJ_BITS_MAX_BYTES:
+            return None
+        
+        bits = np.zeros((size, words), dtype=np.uint64)
+        sources = np.repeat(np.arange(1, size), self.degree)
+        targets = self.neighbors.astype(np.uint64)
+        np.bitwise_or.at(bits, (sources, targets >> np.uint64(6)), np.uint64(1) << (targets & np.uint64(63)))
+        return bits
+    
+    def neighbor_mask(self, node):
+        """
+        Masque de bits des voisins de `node` (vue sur une ligne de self.adj_bits).
+        """
+        if self.adj_bits is None:
+            raise ValueError(f"Graph '{self.name}' is too large for a bitset adjacency")
+        return self.adj_bits[node]
+    
+    @cached_property
+    def degree_order(self):
+        """
+        Numéros des nœuds par degré décroissant (à degré égal, par numéro croissant).
+        """
+        return np.argsort(-self.degree, kind='stable').astype(np.int32) + 1
+    
     def countNode(self):
-        return len(self.graph)
+        # Tant que le fichier n'est pas analysé, seule la ligne d'en-tête est lue
+        if 'offsets' not in self.__dict__:
+            return self._header_nodes
+        return self.offsets.size - 1
     
     def countEdge(self):
-        return sum([len(self.graph[node]) for node in self.graph]) // 2
+        # Chaque arête apparaît deux fois dans la représentation CSR
+        return int(self.offsets[-1]) >> 1
     
     def getGraph(self):
-        return self.graph
+        """
+        Dictionnaire d'adjacence {nœud: liste des voisins}, construit à la première demande
+        à partir de la représentation CSR.
+        """
+        if self._graph is None:
+            neighbors = self.neighbors.tolist()
+            bounds = self.offsets.tolist()
+            self._graph = {v: neighbors[bounds[v - 1]:bounds[v]] for v in range(1, len(bounds))}
+        return self._graph
     
     def childNode(self, node):
-        return self.graph[node]
+        """
+        Voisins de `node` : vue en lecture seule (np.int32) sur la représentation CSR, sans copie.
+        """
+        if not 1 <= node <= self.countNode():
+            raise KeyError(node)
+        view = self.neighbors[self.offsets[node - 1]:self.offsets[node]]
+        view.flags.writeable = False
+        return view
     
-    def setColors(self, colors: dict[int, int]):
-        set_nodes = set(colors.keys())
+    def childNode_list(self, node):
+        """
+        Voisins de `node` sous forme de liste d'entiers Python.
+        """
+        return self.childNode(node).tolist()
+    
+    def to_csr(self):
+        """
+        Représentation CSR du graphe : identifiants des nœuds (n), pointeurs de ligne (n+1)
+        et identifiants des voisins (2m).
+        """
+        node_ids = np.arange(1, self.countNode() + 1, dtype=np.int32)
+        return node_ids, self.offsets, self.neighbors
+    
+    def set_colors_array(self, colors):
+        """
+        Affecte les couleurs depuis un tableau d'entiers : soit de taille N (couleurs des
+        nœuds 1 à N), soit de taille N + 1 indexé directement par le numéro du nœud.
+        """
+        colors = np.asarray(colors)
+        n = self.countNode()
+        if colors.dtype.kind not in 'iu':
+            raise ValueError("Variable 'colors' must have integer values")
+        if colors.shape not in ((n,), (n + 1,)):
+            raise ValueError("Variable 'colors' must have one value per node of the graph")
+        # Les valeurs hors de l'intervalle de self.colors (int32) sont refusées plutôt que tronquées
+        bounds = np.iinfo(self.colors.dtype)
+        if colors.size and (colors.min() < bounds.min or colors.max() > bounds.max):
+            raise ValueError(f"Variable 'colors' must have values between {bounds.min} and {bounds.max}")
         
+        target = self.colors[1:] if colors.shape == (n,) else self.colors
+        np.copyto(target, colors, casting='same_kind')
+        self._color_mask = self._compute_color_mask()
+    
+    @cached_property
+    def _color_mask(self):
+        return self._compute_color_mask()
+    
+    def _compute_color_mask(self):
+        """
+        Masque de bits des couleurs utilisées (bit c à 1 si un nœud a la couleur c), ou None
+        si une couleur sort de l'intervalle [0, MAX_MASK_COLORS).
+        """
+        colors = self.colors[1:]
+        if colors.size and (colors.min() < 0 or colors.max() >= MAX_MASK_COLORS):
+            return None
+        used = np.zeros(MAX_MASK_COLORS, dtype=bool)
+        used[colors] = True
+        return np.packbits(used, bitorder='little').view(np.uint64)
+    
+    def setColors(self, colors: dict[int, int]):
         if not isinstance(colors, dict):
             raise ValueError("Variable 'colors' must be a dictionary")
-        if set_nodes != set(self.graph.keys()):
+        n = self.countNode()
+        # Les nœuds du graphe sont numérotés de 1 à N : pas besoin du dictionnaire d'adjacence
+        if len(colors) != n or colors.keys() != set(range(1, n + 1)):
             raise ValueError("Variable 'colors' must have the same keys as the graph")
-        if not all([isinstance(v, int) for v in colors.values()]):
+        if not all(isinstance(v, int) for v in colors.values()):
             raise ValueError("Variable 'colors' must have integer values")
         
-        self.colors = colors
+        # Lecture en int64 : set_colors_array refuse les valeurs qui ne tiennent pas en int32
+        self.set_colors_array(np.fromiter((colors[node] for node in range(1, n + 1)), dtype=np.int64, count=n))
         
     def getColors(self):
-        return self.colors
+        return dict(enumerate(self.colors[1:].tolist(), start=1))
     
     def countColors(self):
-        return len(set(self.colors.values())) 
\ No newline at end of file
+        if self._color_mask is None:
+            return int(np.unique(self.colors[1:]).size)
+        return sum(word.bit_count() for word in self._color_mask.tolist())
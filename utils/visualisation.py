@@ -1,28 +1,44 @@
+import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
+
+# Colonnes des résultats de benchmark : (nœuds, densité, durée, résolu)
+_COLUMNS = np.dtype([('nodes', np.int32), ('density', np.float64), ('duration', np.float64), ('solved', np.bool_)])
+
+def _columns(data):
+    """
+    Transpose les résultats `data` (n-uplets nœuds, densité, durée, résolu, ...) en un
+    tableau structuré dont chaque champ est une colonne.
+    """
+    cols = np.empty(len(data), dtype=_COLUMNS)
+    if not len(data):
+        return cols
+    rows = np.asarray(data, dtype=object)
+    for j, name in enumerate(_COLUMNS.names):
+        cols[name] = rows[:, j]
+    return cols
 
 def plot_resolution_map(data):
-    num_nodes, edge_densities, durations = zip(*[(d[0], d[1], d[2]) for d in data])
+    cols = _columns(data)
 
-    plt.figure(figsize=(10, 6))
-    sc = plt.scatter(num_nodes, edge_densities, c=durations, cmap='viridis', s=100, alpha=0.7, edgecolors='w', linewidth=0.5)
-    plt.colorbar(sc, label='Temps de résolution (s)')
-    plt.xlabel('Nombre de noeuds')
-    plt.ylabel('Densité')
-    plt.title('Temps de résolution en fonction du nombre de noeuds et de la densité')
-    plt.grid(True)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    # Marqueurs sans contour : un seul tracé par point
+    sc = ax.scatter(cols['nodes'], cols['density'], c=cols['duration'], cmap='viridis', s=100, alpha=0.7, linewidths=0)
+    fig.colorbar(sc, ax=ax, label='Temps de résolution (s)')
+    ax.set_xlabel('Nombre de noeuds')
+    ax.set_ylabel('Densité')
+    ax.set_title('Temps de résolution en fonction du nombre de noeuds et de la densité')
+    ax.grid(True)
     plt.show()
 
 def plot_solved_vs_unsolved(data):
-    num_nodes, edge_densities, solved = zip(*[(d[0], d[1], d[3]) for d in data])
-
-    solved_numeric = [1 if s else 0 for s in solved]
+    cols = _columns(data)
+    solved_numeric = cols['solved'].view(np.uint8)
 
-    plt.figure(figsize=(10, 6))
-    sc = plt.scatter(num_nodes, edge_densities, c=solved_numeric, cmap='coolwarm', s=100, alpha=0.7, edgecolors='w', linewidth=0.5)
-    plt.colorbar(sc, label='Résolus (1) / Non Résolus (0)')
-    plt.xlabel('Nombre de noeuds')
-    plt.ylabel('Densité')
-    plt.title('Statut de résolution en fonction du nombre de noeuds et de la densité')
-    plt.grid(True)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sc = ax.scatter(cols['nodes'], cols['density'], c=solved_numeric, cmap='coolwarm', s=100, alpha=0.7, linewidths=0)
+    fig.colorbar(sc, ax=ax, label='Résolus (1) / Non Résolus (0)')
+    ax.set_xlabel('Nombre de noeuds')
+    ax.set_ylabel('Densité')
+    ax.set_title('Statut de résolution en fonction du nombre de noeuds et de la densité')
+    ax.grid(True)
     plt.show()